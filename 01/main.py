@@ -1,29 +1,111 @@
 #!/usr/bin/env python3
-from itertools import groupby
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
-def part1(input_path):
+def keep_largest(heap, item, k):
+    '''Push `item` into the min-heap `heap`, keeping at most `k` items'''
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    elif item > heap[0]:
+        heapq.heapreplace(heap, item)
+
+
+def top_totals(lines, k):
+    '''Largest `k` elf totals (descending) from a single pass over `lines`'''
+    if k < 1:
+        return []
+    heap, total, in_group = [], 0, False
+    for line in lines:
+        if line:
+            total += int(line)
+            in_group = True
+        elif in_group:
+            keep_largest(heap, total, k)
+            total, in_group = 0, False
+
+    if in_group:
+        keep_largest(heap, total, k)
+
+    return sorted(heap, reverse=True)
+
+
+def solve(input_path, k=3):
     with open(input_path) as f:
-        lines = map(str.strip, f)
-        groups = [list(g) for k, g in groupby(lines, key=len) if k > 0]
-        elves = [list(map(int, g)) for g in groups]
-        print(max(map(sum, elves)))
+        return top_totals(map(str.strip, f), k)
+
+
+def align_to_group(f, offset):
+    '''First offset at or after `offset` that starts a new group of lines'''
+    if offset == 0:
+        return 0
+    f.seek(offset - 1)
+    f.readline()    # Finish the line that straddles `offset`...
+    while line := f.readline():
+        if not line.strip():
+            break   # ... and then the group it belongs to.
+    return f.tell()
+
+
+def split_groups(input_path, jobs):
+    '''Split the file into `jobs` byte ranges that never split a group'''
+    size = os.path.getsize(input_path)
+    with open(input_path, 'rb') as f:
+        bounds = [align_to_group(f, size * i // jobs) for i in range(jobs)]
+    return list(zip(bounds, bounds[1:] + [size]))
+
+
+def read_range(input_path, start, end):
+    with open(input_path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        for line in f:
+            if remaining <= 0:
+                break
+            remaining -= len(line)
+            yield line.strip()
+
+
+def range_totals(input_path, start, end, k):
+    return top_totals(read_range(input_path, start, end), k)
+
+
+def solve_parallel(input_path, k=3, jobs=None):
+    '''Same as `solve`, but each byte range is summed in its own process'''
+    jobs = jobs or os.cpu_count()
+    ranges = [r for r in split_groups(input_path, jobs) if r[0] < r[1]]
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(range_totals, input_path, start, end, k)
+                   for start, end in ranges]
+        totals = chain.from_iterable(future.result() for future in futures)
+        return heapq.nlargest(k, totals)
+
+
+def part1(input_path):
+    print(solve(input_path, k=1)[0])
 
 
 def part2(input_path):
-    with open(input_path) as f:
-        lines = map(str.strip, f)
-        groups = [list(g) for k, g in groupby(lines, key=len) if k > 0]
-        elves = [list(map(int, g)) for g in groups]
-        totals = sorted(map(sum, elves))
-        print(sum(totals[-3:]))
+    print(sum(solve(input_path, k=3)))
 
 
 if __name__ == '__main__':
-    import sys
-
-    if len(sys.argv) < 2:
-        print('ERROR: input file path not provided', file=sys.stderr)
-        sys.exit(1)
+    import argparse
 
-    part2(sys.argv[1])
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_path')
+    parser.add_argument('--top', type=int, default=3, metavar='K',
+                        help='sum the calories of the top K elves (default: 3)')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='sum byte ranges of the file in N processes')
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error('--top must be at least 1')
+    if args.jobs is not None and args.jobs < 1:
+        parser.error('--jobs must be at least 1')
 
+    if args.jobs is None:
+        print(sum(solve(args.input_path, k=args.top)))
+    else:
+        print(sum(solve_parallel(args.input_path, k=args.top, jobs=args.jobs)))
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+import part1
+import part2
+from rounds import solve
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print('ERROR: input file(s) not provided', file=sys.stderr)
+        sys.exit(1)
+
+    for filepath in sys.argv[1:]:
+        score1, score2 = solve(filepath, part1.TABLE, part2.TABLE)
+        print(f'Input file: {filepath}')
+        print(f'  Part 1: {score1}')
+        print(f'  Part 2: {score2}')
+        print()
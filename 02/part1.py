@@ -1,22 +1,12 @@
 #!/usr/bin/env python3
 from enum import Enum
-from itertools import starmap
+from rounds import solve
 
 class Shape(Enum):
     ROCK     = 0
     PAPER    = 1
     SCISSORS = 2
 
-    @classmethod
-    def from_character(cls, character):
-        if character in 'ABC':
-            return cls(ord(character) - ord('A'))
-
-        if character in 'XYZ':
-            return cls(ord(character) - ord('X'))
-
-        raise ValueError(f'{character} is not a valid shape')
-
 
 def score(theirs, ours):
     LOSE, DRAW, WIN = 0, 3, 6
@@ -30,12 +20,12 @@ def score(theirs, ours):
     return outcome[ours.value][theirs.value] + ours.value + 1
 
 
+# Score of every possible round, indexed by [theirs][ours].
+TABLE = [[score(theirs, ours) for ours in Shape] for theirs in Shape]
+
+
 def part1(input_path):
-    with open(input_path) as f:
-        lines = filter(len, map(str.strip,f))
-        rounds = (map(Shape.from_character, line.split(' ')) for line in lines)
-        scores = starmap(score, rounds)
-        print(sum(scores))
+    print(*solve(input_path, TABLE))
 
 
 if __name__ == '__main__':
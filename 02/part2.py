@@ -1,18 +1,12 @@
 #!/usr/bin/env python3
 from enum import Enum
-from itertools import starmap
+from rounds import solve
 
 class Shape(Enum):
     ROCK     = 1
     PAPER    = 2
     SCISSORS = 3
 
-    @classmethod
-    def from_character(cls, character):
-        if character in 'ABC':
-            return cls(ord(character) - ord('A') + 1)
-        raise ValueError(f'{character} is not a valid shape')
-
     def as_index(self):
         return self.value - 1
 
@@ -22,23 +16,10 @@ class Outcome(Enum):
     DRAW = 3
     WIN  = 6
 
-    @classmethod
-    def from_character(cls, character):
-        if character in 'XYZ':
-            return cls(3 * (ord(character) - ord('X')))
-        raise ValueError(f'{character} is not a valid outcome')
-
     def as_index(self):
         return self.value // 3
 
 
-def parse(f):
-    lines = filter(len, map(str.strip,f))
-    for line in lines:
-        parts = line.split(' ')
-        yield Shape.from_character(parts[0]), Outcome.from_character(parts[1])
-
-
 def score(theirs, outcome):
     MAP = [
         # Lose              Draw            Win         ← outcome, theirs ↓
@@ -50,11 +31,12 @@ def score(theirs, outcome):
     return outcome.value + ours.value
 
 
+# Score of every possible round, indexed by [theirs][outcome].
+TABLE = [[score(theirs, outcome) for outcome in Outcome] for theirs in Shape]
+
+
 def part2(input_path):
-    with open(input_path) as f:
-        rounds = parse(f)
-        scores = starmap(score, rounds)
-        print(sum(scores))
+    print(*solve(input_path, TABLE))
 
 
 if __name__ == '__main__':
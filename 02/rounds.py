@@ -0,0 +1,53 @@
+import re
+
+SHAPES, RESPONSES = b'ABC', b'XYZ'
+ROUNDS = [bytes((theirs, ord(' '), ours)) for theirs in SHAPES for ours in RESPONSES]
+WHITESPACE = b' \t\n\r\x0b\x0c'
+BLANK_LINE = re.compile(rb'^[ \t\r\x0b\x0c]*\n', re.MULTILINE)
+
+def count_rounds(f, chunk_size=1 << 20):
+    '''Count how many times each of the nine rounds appears in binary file `f`
+
+    Returns a 3×3 list indexed by [theirs][response], with both in the order
+    they appear in the strategy guide alphabet (A, B, C and X, Y, Z). Lines may
+    have whitespace around their round, and whitespace-only lines are blank.
+    Raises ValueError if any other line is not exactly one of the nine rounds.
+    '''
+    counts = [0] * len(ROUNDS)
+    lines, content = 0, 0   # Non-blank lines and bytes other than whitespace.
+    carry = b''
+    while chunk := f.read(chunk_size):
+        chunk = carry + chunk
+        end = chunk.rfind(b'\n') + 1    # Never count a line split in half.
+        chunk, carry = chunk[:end], chunk[end:]
+        for i, line in enumerate(ROUNDS):
+            counts[i] += chunk.count(line)
+        newlines = chunk.count(b'\n')
+        lines += newlines - len(BLANK_LINE.findall(chunk))
+        content += len(chunk.translate(None, WHITESPACE))
+    for i, line in enumerate(ROUNDS):
+        counts[i] += carry.count(line)
+    if carry.strip():
+        lines += 1
+        content += len(carry.translate(None, WHITESPACE))
+
+    # Every line has to be a whole round, and nothing but that round: the two
+    # letters are its only bytes that are not whitespace.
+    rounds = sum(counts)
+    if lines != rounds or content != 2 * rounds:
+        raise ValueError('Strategy guide has lines that are not a valid round')
+    return [counts[i:i + 3] for i in range(0, len(counts), 3)]
+
+
+def total(counts, table):
+    return sum(
+        count * score
+        for count_row, score_row in zip(counts, table)
+        for count, score in zip(count_row, score_row))
+
+
+def solve(input_path, *tables):
+    '''Total score for each of `tables`, from a single scan of the file'''
+    with open(input_path, 'rb') as f:
+        counts = count_rounds(f)
+    return tuple(total(counts, table) for table in tables)
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+from rucksacks import solve_files
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print('ERROR: input file(s) not provided', file=sys.stderr)
+        sys.exit(1)
+
+    for filepath, part1, part2 in solve_files(sys.argv[1:]):
+        print(f'Input file: {filepath}')
+        print(f'  Part 1: {part1}')
+        print(f'  Part 2: {part2}')
+        print()
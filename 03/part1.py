@@ -1,29 +1,16 @@
 #!/usr/bin/env python3
+from rucksacks import common_mask, single_priority
 
-def parse_rucksack(line):
+def inspect(line):
     middle = len(line) // 2
-    return set(line[0:middle]), set(line[middle:])
-
-
-def inspect(rucksack):
-    common = rucksack[0] & rucksack[1]
-    if len(common) != 1:
-        raise Exception(f'{len(common)} duplicates in {rucksack}')
-    return common.pop()
-
-
-def priority(item):
-    if item.islower():
-        return ord(item) - ord('a') + 1
-    return ord(item) - ord('A') + 27
+    common = common_mask(line[:middle], line[middle:])
+    return single_priority(common, 'duplicates', line)
 
 
 def part1(input_path):
-    with open(input_path) as f:
-        lines = filter(len, map(str.strip, f))
-        rucksacks = map(parse_rucksack, lines)
-        items = map(inspect, rucksacks)
-        prios = map(priority, items)
+    with open(input_path, 'rb') as f:
+        lines = filter(len, map(bytes.strip, f))
+        prios = map(inspect, lines)
         print(sum(prios))
 
 
@@ -35,4 +22,3 @@ if __name__ == '__main__':
         sys.exit(1)
 
     part1(sys.argv[1])
-
@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from functools import reduce
+from rucksacks import common_mask, single_priority
 
 def make_groups(iterable, n):
     args = [iter(iterable)] * n
@@ -7,25 +7,14 @@ def make_groups(iterable, n):
 
 
 def find_badge(group):
-    badges = reduce(set.intersection, group)
-    if len(badges) != 1:
-        raise Exception(f'{len(badges)} badges in group {group}')
-    return badges.pop()
-
-
-def priority(item):
-    if item.islower():
-        return ord(item) - ord('a') + 1
-    return ord(item) - ord('A') + 27
+    return single_priority(common_mask(*group), 'badges')
 
 
 def part2(input_path):
-    with open(input_path) as f:
-        lines = filter(len, map(str.strip, f))
-        rucksacks = map(set, lines)
-        groups = make_groups(rucksacks, n=3)
-        badges = map(find_badge, groups)
-        prios = map(priority, badges)
+    with open(input_path, 'rb') as f:
+        lines = filter(len, map(bytes.strip, f))
+        groups = make_groups(lines, n=3)
+        prios = map(find_badge, groups)
         print(sum(prios))
 
 
@@ -37,4 +26,3 @@ if __name__ == '__main__':
         sys.exit(1)
 
     part2(sys.argv[1])
-
@@ -0,0 +1,44 @@
+# Bit for each item, indexed by its byte value: 'a' → 1 << 0, 'Z' → 1 << 51.
+# An item's priority is therefore the `bit_length` of its bit.
+ITEM_BITS = [0] * 256
+for prio, item in enumerate(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'):
+    ITEM_BITS[item] = 1 << prio
+
+
+def common_mask(first, *others):
+    '''Mask of the items found in `first` and in every one of `others`'''
+    # Intersecting the raw bytes and encoding only what they share keeps the
+    # per-item work in C; building a mask for every rucksack costs more.
+    common = set(first).intersection(*others)
+    return sum(map(ITEM_BITS.__getitem__, common))
+
+
+def single_priority(mask, what, line=None):
+    if mask == 0 or mask & (mask - 1):
+        where = 'group' if line is None else line.decode()
+        raise Exception(f'{bin(mask).count("1")} {what} in {where}')
+    return mask.bit_length()
+
+
+def solve(f, group_size=3):
+    '''Part 1 and part 2 priority sums from one pass over binary file `f`'''
+    duplicates, badges = 0, 0
+    group = []
+    for line in filter(len, map(bytes.strip, f)):
+        middle = len(line) // 2
+        common = common_mask(line[:middle], line[middle:])
+        duplicates += single_priority(common, 'duplicates', line)
+
+        group.append(line)
+        if len(group) == group_size:
+            badges += single_priority(common_mask(*group), 'badges')
+            group.clear()
+
+    return duplicates, badges
+
+
+def solve_files(filepaths):
+    '''Yield `(filepath, part1, part2)` for each file in `filepaths`'''
+    for filepath in filepaths:
+        with open(filepath, 'rb') as f:
+            yield filepath, *solve(f)
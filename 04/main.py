@@ -1,10 +1,29 @@
 #!/usr/bin/env python3
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
 from functools import partial
-from itertools import starmap
+from itertools import chain, starmap
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# A line holding one pair of ranges, and any line that is not blank.
+# `[^\S\n]` is whitespace that does not end the line.
+PAIR = re.compile(rb'^[^\S\n]*(\d+)-(\d+),(\d+)-(\d+)[^\S\n]*$', re.MULTILINE)
+NON_BLANK = re.compile(rb'^[^\S\n]*\S', re.MULTILINE)
+
+
+Interval = namedtuple('Interval', 'start,end')
+
 
 def parse_range(range_str):
     start, end = map(int, range_str.split('-'))
-    return set(range(start, end + 1))
+    return Interval(start, end)
 
 
 def solve(filepath, select_pairs):
@@ -16,8 +35,12 @@ def solve(filepath, select_pairs):
         return sum(overlaps)
 
 
+def contains(a, b):
+    return a.start <= b.start and b.end <= a.end
+
+
 def full_overlap(a, b):
-    return a.issubset(b) or b.issubset(a)
+    return contains(a, b) or contains(b, a)
 
 
 def part1(filepath):
@@ -25,13 +48,102 @@ def part1(filepath):
 
 
 def any_overlap(a, b):
-    return not a.isdisjoint(b)
+    return a.start <= b.end and b.start <= a.end
 
 
 def part2(filepath):
     return solve(filepath, any_overlap)
 
 
+class IntervalIndex:
+    '''Answers overlap and containment counts for any query `Interval`'''
+
+    def __init__(self, intervals):
+        intervals = sorted(intervals)
+        self.starts = [interval.start for interval in intervals]
+        self.ends = sorted(interval.end for interval in intervals)
+
+        # Fenwick tree over the intervals in start order: node `i` keeps the
+        # sorted ends of the intervals at positions (i - lowbit(i), i].
+        ends = [interval.end for interval in intervals]
+        self.tree = [[]] + [sorted(ends[i - (i & -i):i])
+                            for i in range(1, len(ends) + 1)]
+
+    @classmethod
+    def parse(cls, f):
+        lines = filter(len, map(str.strip, f))
+        return cls(parse_range(r) for line in lines for r in line.split(','))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _ends_before(self, k, value):
+        '''How many of the first `k` intervals (by start) end before `value`'''
+        count = 0
+        while k > 0:
+            count += bisect_left(self.tree[k], value)
+            k -= k & -k
+        return count
+
+    def overlapping(self, query):
+        '''Intervals sharing at least one section with `query`'''
+        # Those starting no later than the query's end, except the ones that
+        # also end before the query starts.
+        return (bisect_right(self.starts, query.end)
+                - bisect_left(self.ends, query.start))
+
+    def containing(self, query):
+        '''Intervals that fully contain `query`'''
+        k = bisect_right(self.starts, query.start)
+        return k - self._ends_before(k, query.end)
+
+    def contained_in(self, query):
+        '''Intervals fully contained in `query`'''
+        k = bisect_left(self.starts, query.start)
+        return (bisect_right(self.ends, query.end)
+                - self._ends_before(k, query.end + 1))
+
+
+def solve_queries(filepath, queries):
+    '''Yield `(overlapping, containing)` counts for each query `Interval`'''
+    with open(filepath) as f:
+        index = IntervalIndex.parse(f)
+    for query in queries:
+        yield index.overlapping(query), index.containing(query)
+
+
+def parse_columns(f):
+    '''Parse all pairs into four integer columns: a.start, a.end, b.start, b.end'''
+    data = f.read()
+    pairs = PAIR.findall(data)
+    if len(pairs) != len(NON_BLANK.findall(data)):
+        raise ValueError('Assignment list has lines that are not a pair of ranges')
+    numbers = array('q', map(int, chain.from_iterable(pairs)))
+    return tuple(numbers[i::4] for i in range(4))
+
+
+def count_overlaps(columns):
+    '''Part 1 and part 2 counts from the columns produced by `parse_columns`'''
+    if np is not None:
+        a0, a1, b0, b1 = (np.frombuffer(column, dtype=np.int64) for column in columns)
+        full = ((a0 <= b0) & (b1 <= a1)) | ((b0 <= a0) & (a1 <= b1))
+        any_ = (a0 <= b1) & (b0 <= a1)
+        return int(full.sum()), int(any_.sum())
+
+    full, any_ = 0, 0
+    for a0, a1, b0, b1 in zip(*columns):
+        if a0 <= b1 and b0 <= a1:
+            any_ += 1
+            if (a0 <= b0 and b1 <= a1) or (b0 <= a0 and a1 <= b1):
+                full += 1
+    return full, any_
+
+
+def solve_columnar(filepath):
+    with open(filepath, 'rb') as f:
+        return count_overlaps(parse_columns(f))
+
+
 if __name__ == '__main__':
     import sys
 
@@ -40,8 +152,8 @@ if __name__ == '__main__':
         sys.exit(1)
 
     for filepath in sys.argv[1:]:
+        part1, part2 = solve_columnar(filepath)
         print(f'Input file: {filepath}')
-        print(f'  Part 1: {part1(filepath)}')
-        print(f'  Part 2: {part2(filepath)}')
+        print(f'  Part 1: {part1}')
+        print(f'  Part 2: {part2}')
         print()
-
@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
+import random
+import time
 from collections import namedtuple
-from itertools import takewhile
+from itertools import groupby, takewhile
 
 def parse_stacks(lines):
     columns = [col for col, char in enumerate(lines[-1]) if char != ' ']
@@ -24,13 +26,36 @@ def parse_instruction(line):
     )
 
 
-def crate_mover_9000(stacks, instructions):
+def fuse_moves(instructions):
+    '''Merge back-to-back moves between the same stacks into a single move
+
+    Only valid for the CrateMover 9000: it moves one crate at a time, so two
+    consecutive moves from `src` to `dst` are the same as one bigger move.
+    '''
+    for (src, dst), group in groupby(instructions, key=lambda i: i[1:]):
+        yield Instruction(sum(inst.count for inst in group), src, dst)
+
+
+def crate_mover_9000_stepwise(stacks, instructions):
     for inst in instructions:
         for _ in range(inst.count):
             src, dst = stacks[inst.src], stacks[inst.dst]
             dst.append(src.pop())
 
 
+def crate_mover_9000(stacks, instructions):
+    # Moving crates one at a time is the same as moving all of them at once
+    # and reversing their order.
+    for inst in fuse_moves(instructions):
+        src, dst = stacks[inst.src], stacks[inst.dst]
+        if inst.count > len(src):
+            raise ValueError(f'Cannot move {inst.count} crates from stack '
+                             f'{inst.src + 1}, which holds {len(src)}')
+        bottom = len(src) - inst.count
+        dst.extend(reversed(src[bottom:]))
+        del src[bottom:]
+
+
 def crate_mover_9001(stacks, instructions):
     for inst in instructions:
         src, dst = stacks[inst.src], stacks[inst.dst]
@@ -49,6 +74,44 @@ def solve(filepath, crate_mover):
         return ''.join(tops)
 
 
+def trace_tops(stacks, instructions, reverse):
+    '''Top crates after `instructions`, without moving any crates
+
+    Walks the instructions backwards, following where each final top crate
+    came from, and reads it from the initial `stacks`. `reverse` selects the
+    CrateMover 9000 (True) or 9001 (False) ordering of each moved block.
+    '''
+    instructions = list(instructions)
+    heights = [len(stack) for stack in stacks]
+    for inst in instructions:
+        heights[inst.src] -= inst.count
+        heights[inst.dst] += inst.count
+
+    # (stack, index from the bottom) of every final top crate.
+    positions = [(s, h - 1) for s, h in enumerate(heights) if h > 0]
+    for inst in reversed(instructions):
+        heights[inst.src] += inst.count     # Heights before `inst`.
+        heights[inst.dst] -= inst.count
+        for i, (stack, index) in enumerate(positions):
+            offset = index - heights[inst.dst]
+            if stack == inst.dst and offset >= 0:
+                if reverse:
+                    index = heights[inst.src] - 1 - offset
+                else:
+                    index = heights[inst.src] - inst.count + offset
+                positions[i] = (inst.src, index)
+
+    return ''.join(stacks[stack][index] for stack, index in positions)
+
+
+def solve_traced(filepath, reverse):
+    with open(filepath) as f:
+        lines = map(str.rstrip, f)
+        stacks = parse_stacks(list(takewhile(len, lines)))
+        instructions = map(parse_instruction, lines)
+        return trace_tops(stacks, instructions, reverse)
+
+
 def part1(filepath):
     return solve(filepath, crate_mover_9000)
 
@@ -57,9 +120,53 @@ def part2(filepath):
     return solve(filepath, crate_mover_9001)
 
 
+def synthetic_input(stack_count=9, height=10_000, moves=20_000, max_count=5_000):
+    stacks = [[chr(ord('A') + (i + j) % 26) for j in range(height)]
+              for i in range(stack_count)]
+    heights = [height] * stack_count
+    instructions = []
+    for _ in range(moves):
+        # Repeat the previous move half of the time, so there is something
+        # for `fuse_moves` to merge.
+        if instructions and random.random() < 0.5 and heights[instructions[-1].src]:
+            src, dst = instructions[-1].src, instructions[-1].dst
+        else:
+            src = random.choice([i for i, h in enumerate(heights) if h > 0])
+            dst = random.choice([i for i in range(stack_count) if i != src])
+        count = random.randint(1, min(max_count, heights[src]))
+        heights[src] -= count
+        heights[dst] += count
+        instructions.append(Instruction(count, src, dst))
+    return stacks, instructions
+
+
+def benchmark(**kwargs):
+    stacks, instructions = synthetic_input(**kwargs)
+    print(f'Benchmark: {len(stacks)} stacks, {len(instructions)} moves')
+    results = []
+    for crate_mover in (crate_mover_9000_stepwise, crate_mover_9000):
+        copy = [list(stack) for stack in stacks]
+        start = time.perf_counter()
+        crate_mover(copy, instructions)
+        elapsed = time.perf_counter() - start
+        results.append(copy)
+        print(f'  {crate_mover.__name__:<26} {elapsed:8.3f}s')
+    assert results[0] == results[1], 'Stacks differ after the benchmark'
+
+    start = time.perf_counter()
+    tops = trace_tops(stacks, instructions, reverse=True)
+    elapsed = time.perf_counter() - start
+    print(f'  {trace_tops.__name__:<26} {elapsed:8.3f}s')
+    assert tops == ''.join(s[-1] for s in results[0] if s), 'Tops differ'
+
+
 if __name__ == '__main__':
     import sys
 
+    if sys.argv[1:] == ['--benchmark']:
+        benchmark()
+        sys.exit(0)
+
     if len(sys.argv) < 2:
         print('ERROR: input file(s) not provided', file=sys.stderr)
         sys.exit(1)
@@ -1,28 +1,54 @@
 #!/usr/bin/env python3
-from itertools import tee, islice
+from functools import partial
 
-def rolling_window(iterable, width=2):
-    return zip(*[
-        islice(it, skip, None)
-        for skip, it
-        in enumerate(tee(iterable, width))
-    ])
+def read_chunks(f, size=1 << 16):
+    return iter(partial(f.read, size), b'')
+
+
+def find_markers(chunks, lengths):
+    '''Yield `(length, position)` for every marker of each of `lengths`
+
+    A marker of length L ends at `position` when the L characters before it
+    are all different. `chunks` is an iterable of bytes-like objects.
+    '''
+    last_seen = [-1] * 256
+    distinct_since = 0  # Where the run of distinct characters ending at i starts.
+    i = 0
+    for chunk in chunks:
+        for char in chunk:
+            if last_seen[char] >= distinct_since:
+                distinct_since = last_seen[char] + 1
+            last_seen[char] = i
+            i += 1
+            run = i - distinct_since
+            for length in lengths:
+                if run >= length:
+                    yield length, i
+
+
+def first_markers(f, lengths):
+    '''Position of the first marker of each of `lengths` in binary file `f`'''
+    found = {}
+    for length, position in find_markers(read_chunks(f), lengths):
+        found.setdefault(length, position)
+        if len(found) == len(lengths):
+            break
+    return [found.get(length) for length in lengths]
 
 
 def find_start(line, /, length):
-    for i, s in enumerate(map(set, rolling_window(line, width=length))):
-        if len(s) == length:
-            return i + length
+    markers = find_markers([line.encode()], [length])
+    return next((position for _, position in markers), None)
 
 
 def part1(filepath):
-    with open(filepath) as f:
-        return find_start(f.read(), length=4)  # start of packet → 4
+    with open(filepath, 'rb') as f:
+        return first_markers(f, [4])[0]     # start of packet → 4
 
 
 def part2(filepath):
-    with open(filepath) as f:
-        return find_start(f.read(), length=14)  # start of message → 14
+    with open(filepath, 'rb') as f:
+        return first_markers(f, [14])[0]    # start of message → 14
 
 
 if __name__ == '__main__':
@@ -33,8 +59,9 @@ if __name__ == '__main__':
         sys.exit(1)
 
     for filepath in sys.argv[1:]:
+        with open(filepath, 'rb') as f:
+            packet, message = first_markers(f, [4, 14])
         print(f'Input file: {filepath}')
-        print(f'  Part 1: {part1(filepath)}')
-        print(f'  Part 2: {part2(filepath)}')
+        print(f'  Part 1: {packet}')
+        print(f'  Part 2: {message}')
         print()
-
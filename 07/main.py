@@ -1,79 +1,261 @@
 #!/usr/bin/env python3
+import heapq
+import sys
+import time
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from operator import attrgetter
+from itertools import accumulate
 
-@dataclass
-class File:
-    name: str
-    size: int
+class FileSystem:
+    '''Flat, array-backed filesystem tree
 
+    Entry `i` has an interned `names[i]`, a `parents[i]` entry and a total
+    `sizes[i]`. For directories `children[i]` maps each child name to its
+    entry, for files it is None. The root is entry 0 and is its own parent.
+    '''
+    ROOT = 0
 
-@dataclass
-class Directory:
-    name: str
-    children: list = field(default_factory=list)
+    def __init__(self):
+        self.names = [sys.intern('/')]
+        self.parents = array('q', [self.ROOT])
+        self.sizes = array('q', [0])
+        self.children = [{}]
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, parent, name, size=None):
+        '''Add a directory (`size` is None) or a file to `parent`'''
+        if (index := self.children[parent].get(name)) is not None:
+            return index    # Already listed.
+
+        index = len(self.names)
+        self.names.append(sys.intern(name))
+        self.parents.append(parent)
+        self.sizes.append(0 if size is None else size)
+        self.children.append({} if size is None else None)
+        self.children[parent][self.names[index]] = index
+        if size:
+            for ancestor in self.ancestors(index):
+                self.sizes[ancestor] += size
+        return index
+
+    def ancestors(self, index):
+        while index != self.ROOT:
+            index = self.parents[index]
+            yield index
+
+    def lookup(self, directory, name):
+        try:
+            return self.children[directory][name]
+        except KeyError:
+            raise KeyError(f'`{name}` not found in {self.names[directory]}') from None
+
+    def view(self, index):
+        if self.children[index] is None:
+            return FileView(self, index)
+        return DirectoryView(self, index)
+
+    @property
+    def root(self):
+        return self.view(self.ROOT)
+
+
+@dataclass(frozen=True)
+class EntryView:
+    fs: FileSystem = field(repr=False)
+    index: int
+
+    @property
+    def name(self):
+        return self.fs.names[self.index]
 
     @property
     def size(self):
-        return sum(child.size for child in self.children)
+        return self.fs.sizes[self.index]
+
+
+class FileView(EntryView):
+    pass
+
+
+class DirectoryView(EntryView):
+    @property
+    def children(self):
+        return [self.fs.view(i) for i in self.fs.children[self.index].values()]
 
     def __getitem__(self, key):
-        for child in self.children:
-            if child.name == key:
-                return child
-        raise KeyError(f'`{key}` not found in {self.name}')
+        return self.fs.view(self.fs.lookup(self.index, key))
 
     def walk_dirs(self):
-        yield self
-        for child in self.children:
-            if isinstance(child, Directory):
-                yield from child.walk_dirs()
+        stack = [self.index]
+        while stack:
+            index = stack.pop()
+            yield DirectoryView(self.fs, index)
+            children = self.fs.children[index].values()
+            stack.extend(i for i in reversed(children)
+                         if self.fs.children[i] is not None)
 
 
-def parse_terminal_output(lines):
-    root = Directory('/')
-    stack = [root]
-    pwd = stack[-1]
-    for line in lines:
+class Terminal:
+    '''Replays terminal output, one line at a time, into a `FileSystem`'''
+
+    def __init__(self):
+        self.fs = FileSystem()
+        self.stack = [self.fs.ROOT]
+
+    def feed(self, line):
+        '''Process one line; returns the listed entry for `ls` output, else None'''
+        pwd = self.stack[-1]
         if line.startswith('$'):
             _, cmd, *args = line.split()
             if cmd == 'cd':
                 name = args[0]
-                if name == '/':     stack = [root]
-                elif name == '..':  stack.pop()
-                else:               stack.append(pwd[name])
-                pwd = stack[-1]
+                if name == '/':     self.stack = [self.fs.ROOT]
+                elif name == '..':  self.stack.pop()
+                else:               self.stack.append(self.fs.lookup(pwd, name))
             else:
                 pass  # ingore other commands, including `ls`
 
         else:  # assume the line is output of `ls`
             size, name = line.split()
-            item = Directory(name) if size == 'dir' else File(name, int(size))
-            pwd.children.append(item)
+            return self.fs.add(pwd, name, None if size == 'dir' else int(size))
 
-    return root
+
+def parse_terminal_output(lines):
+    terminal = Terminal()
+    for line in lines:
+        terminal.feed(line)
+    return terminal.fs.root
+
+
+class SizeIndex:
+    '''Sorted directory sizes and their prefix sums, for O(log n) queries'''
+
+    def __init__(self, root):
+        self.used = root.size
+        self.sizes = sorted(d.size for d in root.walk_dirs())
+        self.totals = [0, *accumulate(self.sizes)]
+
+    def smallest_at_least(self, size):
+        '''Size of the smallest directory of at least `size`, or None'''
+        i = bisect_left(self.sizes, size)
+        return self.sizes[i] if i < len(self.sizes) else None
+
+    def total_below(self, size):
+        '''Sum of the sizes of all directories smaller than `size`'''
+        return self.totals[bisect_left(self.sizes, size)]
+
+    def to_free(self, disk_size, space_required):
+        '''Size of the smallest directory that frees enough space'''
+        available_space = disk_size - self.used
+        return self.smallest_at_least(space_required - available_space)
+
+
+class LiveTranscript(Terminal):
+    '''Keeps both answers current while a transcript is still being written
+
+    Each `ls` entry costs O(depth · log n): only the sizes of the new entry's
+    ancestors change, so only their contributions to the answers are updated.
+    '''
+
+    def __init__(self, limit=100_000, disk_size=70_000_000,
+                 space_required=30_000_000):
+        super().__init__()
+        self.limit = limit
+        self.disk_size = disk_size
+        self.space_required = space_required
+        self.small_total = 0            # Part 1: sum of sizes below `limit`.
+        self.candidates = []            # Part 2: min-heap of (size, entry).
+        self.directories = 0
+        self.added(self.fs.ROOT, 0)
+
+    @property
+    def need(self):
+        return self.space_required - (self.disk_size - self.fs.sizes[self.fs.ROOT])
+
+    def feed(self, line):
+        entries = len(self.fs)
+        index = super().feed(line)
+        if len(self.fs) > entries:     # Ignore entries that were listed before.
+            self.added(index, self.fs.sizes[index])
+        return index
+
+    def added(self, index, size):
+        sizes, need = self.fs.sizes, self.need
+        if self.fs.children[index] is not None:
+            self.directories += 1
+            self.resized(index, 0, 0, need)
+        if size:
+            for ancestor in self.fs.ancestors(index):
+                self.resized(ancestor, sizes[ancestor] - size, sizes[ancestor], need)
+
+    def resized(self, directory, old, new, need):
+        if old < self.limit:
+            self.small_total -= old
+        if new < self.limit:
+            self.small_total += new
+
+        # A directory can only become a candidate by growing (`need` never
+        # decreases), so candidates are pushed here and dropped lazily.
+        if new >= need:
+            heapq.heappush(self.candidates, (new, directory))
+            if len(self.candidates) > 2 * self.directories + 64:
+                self.candidates = list({
+                    (size, d) for size, d in self.candidates
+                    if size == self.fs.sizes[d] and size >= need})
+                heapq.heapify(self.candidates)
+
+    @property
+    def part1(self):
+        return self.small_total
+
+    @property
+    def part2(self):
+        candidates, sizes, need = self.candidates, self.fs.sizes, self.need
+        while candidates and (candidates[0][0] != sizes[candidates[0][1]]
+                              or candidates[0][0] < need):
+            heapq.heappop(candidates)
+        return candidates[0][0] if candidates else None
+
+
+def follow(f, interval=0.5):
+    '''Yield lines from `f` as they are written, like `tail -f`'''
+    partial = ''
+    while True:
+        line = f.readline()
+        if not line:
+            time.sleep(interval)
+            continue
+        partial += line
+        if partial.endswith('\n'):
+            yield partial.rstrip()
+            partial = ''
 
 
 def part1(filepath):
     with open(filepath) as f:
         lines = filter(len, map(str.rstrip, f))
         root = parse_terminal_output(lines)
-        return sum(d.size for d in root.walk_dirs() if d.size < 100_000)
+        return SizeIndex(root).total_below(100_000)
 
 
 def part2(filepath, disk_size=70_000_000, space_required=30_000_000):
     with open(filepath) as f:
         lines = filter(len, map(str.rstrip, f))
         root = parse_terminal_output(lines)
-        available_space = disk_size - root.size
-
-        for d in sorted(root.walk_dirs(), key=attrgetter('size')):
-            if available_space + d.size >= space_required:
-                return d.size
+        return SizeIndex(root).to_free(disk_size, space_required)
 
 
 if __name__ == '__main__':
-    import sys
+    if len(sys.argv) == 3 and sys.argv[1] == '--follow':
+        live = LiveTranscript()
+        with open(sys.argv[2]) as f:
+            for line in filter(len, follow(f)):
+                if live.feed(line) is not None:
+                    print(f'Part 1: {live.part1}  Part 2: {live.part2}', flush=True)
+        sys.exit(0)
 
     if len(sys.argv) < 2:
         print('ERROR: input file(s) not provided', file=sys.stderr)
@@ -1,90 +1,214 @@
 #!/usr/bin/env python3
-import functools
-import operator
+import tempfile
+from array import array
 
-def parse_trees(f):
-    lines = filter(len, map(str.rstrip, f))
-    return tuple(tuple(int(tree) for tree in line) for line in lines)
-
-
-def T(trees):
-    '''Transpose the trees'''
-    return tuple(zip(*trees))
-
-
-def R(trees):
-    '''Reverse each row of trees'''
-    return tuple(tuple(reversed(row)) for row in trees)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-
-def visible_from_west(trees):
-    def look_from_west(row):
-        tallest = -1
-        for tree in row:
-            if tree > tallest:
-                tallest = tree
-                yield True
-            else:
-                yield False
-
-    return tuple(tuple(look_from_west(row)) for row in trees)
+def parse_trees(f):
+    '''Flat grid of tree heights (as ASCII digits) from binary file `f`'''
+    lines = [line for line in map(bytes.rstrip, f) if line]
+    return b''.join(lines), len(lines), len(lines[0])
+
+
+def look_along(grid, start, step, count, visible, scenic):
+    '''Look back along the `count` trees at `start`, `start + step`, ...
+
+    Keeps a stack of the trees that are still able to block the view, so
+    each tree is pushed and popped at most once.
+    '''
+    blockers, heights = [], []
+    for k in range(count):
+        i = start + k * step
+        tree = grid[i]
+        while heights and heights[-1] < tree:
+            heights.pop()
+            blockers.pop()
+        if blockers:
+            scenic[i] *= k - blockers[-1]
+        else:
+            visible[i] = 1          # Every tree before this one is shorter...
+            scenic[i] *= k          # ... and we can see all the way to the edge.
+        blockers.append(k)
+        heights.append(tree)
+
+
+def survey(grid, rows, cols):
+    '''Number of visible trees and highest scenic score'''
+    visible = bytearray(rows * cols)
+    scenic = array('Q', [1]) * (rows * cols)
+    for r in range(rows):
+        look_along(grid, r * cols, 1, cols, visible, scenic)                # West
+        look_along(grid, r * cols + cols - 1, -1, cols, visible, scenic)    # East
+    for c in range(cols):
+        look_along(grid, c, cols, rows, visible, scenic)                    # North
+        look_along(grid, (rows - 1) * cols + c, -cols, rows, visible, scenic)  # South
+    return sum(visible), max(scenic)
+
+
+def grid_view(data, first_line):
+    '''2D uint8 view of the tree heights in `data`, skipping the line breaks
+
+    `first_line` is the grid's first line, line break included; the view is
+    strided over `data`, never a copy.
+    '''
+    cols, stride = len(first_line.rstrip()), len(first_line)
+    size = len(data)
+    while size and data[size - 1] in b'\r\n':
+        size -= 1
+    rows = (size - cols) // stride + 1 if size else 0
+    return np.lib.stride_tricks.as_strided(
+        np.frombuffer(data, dtype=np.uint8), shape=(rows, cols),
+        strides=(stride, 1), writeable=False)
+
+
+def load_trees(data):
+    '''2D uint8 array of tree heights (as ASCII digits) over the file bytes'''
+    return grid_view(data, data[:data.find(b'\n') + 1] or data)
+
+
+def look_west_numpy(heights, visible, scenic):
+    '''Vectorized `look_along` for every row at once, updating in place'''
+    tallest = np.maximum.accumulate(heights, axis=1)
+    visible[:, 0] = True
+    visible[:, 1:] |= heights[:, 1:] > tallest[:, :-1]
+
+    # The view from a tree of height `h` stops at the last tree at least `h`
+    # tall before it, or at the edge of the forest.
+    cols = np.arange(heights.shape[1], dtype=np.int32)
+    distance = np.zeros(heights.shape, dtype=np.int32)
+    for h in np.unique(heights):
+        last = np.maximum.accumulate(np.where(heights >= h, cols, 0), axis=1)
+        np.copyto(distance[:, 1:], cols[1:] - last[:, :-1],
+                  where=heights[:, 1:] == h)
+    scenic *= distance
+
+
+def survey_numpy(grid):
+    '''Same as `survey`, for a 2D NumPy array of heights'''
+    visible = np.zeros(grid.shape, dtype=bool)
+    scenic = np.ones(grid.shape, dtype=np.int64)
+    views = (
+        lambda a: a,                # West
+        lambda a: a[:, ::-1],       # East
+        lambda a: a.T,              # North
+        lambda a: a[::-1].T,        # South
+    )
+    for view in views:
+        look_west_numpy(view(grid), view(visible), view(scenic))
+    return int(visible.sum()), int(scenic.max())
+
+
+def map_trees(filepath):
+    '''Like `load_trees`, but memory-mapped so the grid never has to fit in RAM'''
+    with open(filepath, 'rb') as f:
+        first_line = f.readline()
+    return grid_view(np.memmap(filepath, dtype=np.uint8, mode='r'), first_line)
+
+
+DIGITS = range(ord('0'), ord('9') + 1)
+
+
+def look_north_band(band, start, state):
+    '''Visibility and view distances to the north for a band of rows
+
+    `start` is the index of the band's first row and `state` holds, for each
+    column, the tallest tree so far and the last row with a tree at least `h`
+    tall for each height; it is updated for the next band.
+    '''
+    tallest, last = state
+    running = np.maximum(np.maximum.accumulate(band, axis=0), tallest)
+    visible = band > np.vstack([tallest, running[:-1]])
+    tallest[:] = running[-1]
+
+    rows = np.arange(start, start + len(band), dtype=np.int32)[:, None]
+    distance = np.zeros(band.shape, dtype=np.int32)
+    for k, h in enumerate(DIGITS):
+        last_h = np.maximum(
+            np.maximum.accumulate(np.where(band >= h, rows, 0), axis=0), last[k])
+        np.copyto(distance, rows - np.vstack([last[k], last_h[:-1]]),
+                  where=band == h)
+        last[k] = last_h[-1]
+
+    return visible, distance
+
+
+def survey_mapped(grid, band_bytes=64 << 20):
+    '''Same as `survey_numpy`, with bounded memory for grids larger than RAM
+
+    West and east only need the rows of a band. North and south carry their
+    per-column state across band borders: south is computed first, bottom
+    to top, into a temporary memory-mapped file, and then north, west and
+    east are combined with it top to bottom.
+    '''
+    rows, cols = grid.shape
+    band_rows = max(1, band_bytes // (cols * 16))   # ~16 bytes per cell in use
+    bands = [(r, min(r + band_rows, rows)) for r in range(0, rows, band_rows)]
+
+    def new_state():
+        return (np.full(cols, -1, dtype=np.int16),
+                np.zeros((len(DIGITS), cols), dtype=np.int32))
+
+    with tempfile.TemporaryFile() as f:
+        # South view distance times two, plus one when visible from the south.
+        south = np.memmap(f, dtype=np.int32, mode='w+', shape=grid.shape)
+        state = new_state()
+        for start, end in reversed(bands):
+            visible, distance = look_north_band(
+                np.asarray(grid[start:end][::-1]), rows - end, state)
+            south[start:end] = (2 * distance + visible)[::-1]
+
+        count, best, state = 0, 0, new_state()
+        for start, end in bands:
+            band = np.asarray(grid[start:end])
+            visible, scenic = look_north_band(band, start, state)
+            scenic = scenic.astype(np.int64)
+            look_west_numpy(band, visible, scenic)
+            look_west_numpy(band[:, ::-1], visible[:, ::-1], scenic[:, ::-1])
+            visible |= (south[start:end] & 1).astype(bool)
+            scenic *= south[start:end] >> 1
+            count += int(visible.sum())
+            best = max(best, int(scenic.max()))
+        del south
+
+    return count, best
+
+
+def solve_mapped(filepath, band_bytes=64 << 20):
+    if np is None:
+        raise RuntimeError('The memory-mapped mode requires NumPy')
+    return survey_mapped(map_trees(filepath), band_bytes)
+
+
+def solve(filepath):
+    with open(filepath, 'rb') as f:
+        if np is not None:
+            return survey_numpy(load_trees(f.read()))
+        return survey(*parse_trees(f))
 
 
 def part1(filepath):
-    with open(filepath) as f:
-        trees = parse_trees(f)
-
-        west = visible_from_west(trees)
-        east = R(visible_from_west(R(trees)))
-        north = T(visible_from_west(T(trees)))
-        south = T(R(visible_from_west(R(T(trees)))))
-
-        # Visibility is how many directions each tree is visible from:
-        #   == 0 -> hidden
-        #    > 0 -> visible
-        visibility = tuple(
-            sum(directions)
-            for row in zip(west, east, north, south)
-            for directions in zip(*row))
-
-        # How many trees are visible.
-        return sum(map(lambda v: v > 0, visibility))
-
-
-def view_distance_to_east(trees):
-    def look_east(row):
-        for i, tree in enumerate(row):
-            distance = 0
-            for other in row[i + 1:]:
-                distance += 1
-                if other >= tree:
-                    break
-            yield distance
-
-    return tuple(tuple(look_east(row)) for row in trees)
+    return solve(filepath)[0]
 
 
 def part2(filepath):
-    with open(filepath) as f:
-        trees = parse_trees(f)
-
-        east = view_distance_to_east(trees)
-        west = R(view_distance_to_east(R(trees)))
-        south = T(view_distance_to_east(T(trees)))
-        north = T(R(view_distance_to_east(R(T(trees)))))
-
-        # Scenic score is the product of view distances in all directions.
-        scenic_score = tuple(
-            functools.reduce(operator.mul, directions)
-            for row in zip(west, east, north, south)
-            for directions in zip(*row))
-
-        return max(scenic_score)
+    return solve(filepath)[1]
 
 
 if __name__ == '__main__':
     import sys
 
+    if len(sys.argv) > 1 and sys.argv[1] == '--mmap':
+        for filepath in sys.argv[2:]:
+            part1, part2 = solve_mapped(filepath)
+            print(f'Input file: {filepath}')
+            print(f'  Part 1: {part1}')
+            print(f'  Part 2: {part2}')
+            print()
+        sys.exit(0)
+
     if len(sys.argv) < 2:
         print('ERROR: input file(s) not provided', file=sys.stderr)
         sys.exit(1)
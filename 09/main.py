@@ -1,65 +1,95 @@
 #!/usr/bin/env python3
-from dataclasses import dataclass, astuple
-from itertools import tee
-
-@dataclass
-class Point:
-    x: int = 0
-    y: int = 0
-
+DIRECTIONS = {'R': (1, 0), 'L': (-1, 0), 'U': (0, 1), 'D': (0, -1)}
 
 def parse_motion(line):
     direction, count_str = line.split()
+    if direction not in DIRECTIONS:
+        raise ValueError(f'Invalid direction {direction}')
     return direction, int(count_str)
 
 
-def sign(n):
-    return 1 if n > 0 else (-1 if n < 0 else 0)
-
-
-def pairwise(iterable):
-    a, b = tee(iterable)
-    next(b, None)
-    return zip(a, b)
-
+class Rope:
+    '''Knot coordinates in two flat lists, head first'''
+
+    def __init__(self, knot_count):
+        self.xs = [0] * knot_count
+        self.ys = [0] * knot_count
+
+    def step(self, ux, uy):
+        '''Move the head one step and pull the other knots along
+
+        Returns how many knots moved (counting the head) and whether they all
+        moved by exactly (ux, uy), i.e. the rope is now straight behind the
+        head and every further step in this direction will move all of it.
+        '''
+        xs, ys = self.xs, self.ys
+        xs[0] += ux
+        ys[0] += uy
+        straight = True
+        for k in range(1, len(xs)):
+            dx, dy = xs[k - 1] - xs[k], ys[k - 1] - ys[k]
+            if -1 <= dx <= 1 and -1 <= dy <= 1:
+                return k, False     # This knot stays, so do all after it.
+            sx, sy = (dx > 0) - (dx < 0), (dy > 0) - (dy < 0)
+            xs[k] += sx
+            ys[k] += sy
+            straight = straight and sx == ux and sy == uy
+        return len(xs), straight
+
+    def shift(self, dx, dy):
+        self.xs[:] = [x + dx for x in self.xs]
+        self.ys[:] = [y + dy for y in self.ys]
+
+
+def pack(x, y):
+    '''Single integer key for a position (`y` must fit in 32 bits)'''
+    return (x << 32) + y
+
+
+def execute(motions, rope, visited):
+    '''Apply `motions` to `rope`, adding to `visited[k]` every packed position
+    of knot `k` (for each knot index in `visited`)'''
+    xs, ys = rope.xs, rope.ys
+    knots = sorted(visited)
+    for k in knots:
+        visited[k].add(pack(xs[k], ys[k]))
 
-def execute(motions, rope):
-    yield rope
     for direction, count in motions:
-        for _ in range(count):
-            # Move head one step in `direction`...
-            if   direction == 'R':  rope[0].x += 1
-            elif direction == 'L':  rope[0].x -= 1
-            elif direction == 'U':  rope[0].y += 1
-            elif direction == 'D':  rope[0].y -= 1
-            else: raise ValueError(f'Invalid direction {direction}')
-
-            # ... and then move tail knots as needed.
-            for a, b in pairwise(rope):
-                dx, dy = a.x - b.x, a.y - b.y
-                if abs(dx) > 1 or abs(dy) > 1:
-                    b.x += sign(dx)
-                    b.y += sign(dy)
-
-            yield rope
-
-
-def solve(filepath, knot_count):
-    rope = [Point() for _ in range(knot_count)]
+        ux, uy = DIRECTIONS[direction]
+        step = pack(ux, uy)
+        while count > 0:
+            count -= 1
+            moved, straight = rope.step(ux, uy)
+            for k in knots:
+                if k >= moved:
+                    break
+                visited[k].add(pack(xs[k], ys[k]))
+            if straight and count > 0:
+                # Rope is straight behind the head: move it all in one go.
+                for k in knots:
+                    key = pack(xs[k], ys[k])
+                    visited[k].update(range(key + step, key + (count + 1) * step, step))
+                rope.shift(count * ux, count * uy)
+                count = 0
+
+
+def solve(filepath, knots):
+    '''Number of positions visited by each knot index in `knots`, from one run'''
+    rope = Rope(max(knots) + 1)
+    visited = {k: set() for k in knots}
     with open(filepath) as f:
         lines = filter(len, map(str.rstrip, f))
         motions = map(parse_motion, lines)
-        steps = execute(motions, rope)
-        visited = set(astuple(step[-1]) for step in steps)
-        return len(visited)
+        execute(motions, rope, visited)
+        return {k: len(positions) for k, positions in visited.items()}
 
 
 def part1(filepath):
-    return solve(filepath, knot_count=2)
+    return solve(filepath, knots={1})[1]
 
 
 def part2(filepath):
-    return solve(filepath, knot_count=10)
+    return solve(filepath, knots={9})[9]
 
 
 if __name__ == '__main__':
@@ -70,8 +100,9 @@ if __name__ == '__main__':
         sys.exit(1)
 
     for filepath in sys.argv[1:]:
+        visited = solve(filepath, knots={1, 9})
         print(f'Input file: {filepath}')
-        print(f'  Part 1: {part1(filepath)}')
-        print(f'  Part 2: {part2(filepath)}')
+        print(f'  Part 1: {visited[1]}')
+        print(f'  Part 2: {visited[9]}')
         print()
 
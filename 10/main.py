@@ -1,42 +1,72 @@
 #!/usr/bin/env python3
-def execute(program):
-    x = 1
-    for instruction in program:
-        if instruction == 'noop':
-            yield x
-        elif instruction.startswith('addx'):
-            _, v = instruction.split()
-            yield x
-            yield x
-            x += int(v)
-        else:
-            raise ValueError(f'Invalid instruction: {instruction}')
-    yield x
+from bisect import bisect_right
+from dataclasses import dataclass
+
+@dataclass
+class Timeline:
+    '''Value of `x` as segments: from cycle `starts[i]` on, `x` is `xs[i]`'''
+    starts: list
+    xs: list
+    end: int    # Last cycle of the program (plus one, for the final value).
+
+    @classmethod
+    def compile(cls, program):
+        starts, xs = [1], [1]
+        cycle, x = 1, 1
+        for instruction in program:
+            if instruction == 'noop':
+                cycle += 1
+            elif instruction.startswith('addx'):
+                _, v = instruction.split()
+                cycle += 2
+                x += int(v)
+                starts.append(cycle)
+                xs.append(x)
+            else:
+                raise ValueError(f'Invalid instruction: {instruction}')
+        return cls(starts, xs, cycle)
+
+    def __getitem__(self, cycle):
+        '''Value of `x` during `cycle` (counting from 1, up to `end`)'''
+        if not 1 <= cycle <= self.end:
+            raise IndexError(f'Cycle {cycle} is outside 1..{self.end}')
+        return self.xs[bisect_right(self.starts, cycle) - 1]
+
+    def signal_strength(self, cycles):
+        '''Sum of `cycle * x` over `cycles`, skipping cycles past `end`'''
+        return sum(cycle * self[cycle] for cycle in cycles if cycle <= self.end)
+
+    def segments(self, first, last):
+        '''Yield `(start, stop, x)` covering cycles `first` to `last` (inclusive)'''
+        i = bisect_right(self.starts, first) - 1
+        stops = self.starts[1:] + [self.end + 1]
+        while i < len(self.starts) and self.starts[i] <= last:
+            yield max(self.starts[i], first), min(stops[i], last + 1), self.xs[i]
+            i += 1
 
 
 def part1(filepath):
     with open(filepath) as f:
         program = filter(len, map(str.rstrip, f))
-        xs = execute(program)
-        cycles = enumerate(xs, start=1)
-        interesting = filter(
-            lambda c: c[0] in (20, 60, 100, 140, 180, 220),
-            cycles)
-        return sum(n * x for n, x in interesting)
+        timeline = Timeline.compile(program)
+        return timeline.signal_strength((20, 60, 100, 140, 180, 220))
 
 
-def draw_crt(xs, rows=6, columns=40):
-    for _ in range(rows):
-        yield ''.join(
-            '█' if abs(x - i) < 2 else ' '
-            for i, x in zip(range(columns), xs))
+def draw_crt(timeline, rows=6, columns=40):
+    pixels = []
+    for start, stop, x in timeline.segments(1, rows * columns):
+        pixels.extend(
+            '█' if abs(x - (cycle - 1) % columns) < 2 else ' '
+            for cycle in range(start, stop))
+    for row in range(rows):
+        yield ''.join(pixels[row * columns:(row + 1) * columns])
 
 
 def part2(filepath):
     with open(filepath) as f:
         program = filter(len, map(str.rstrip, f))
-        xs = execute(program)
-        crt = draw_crt(xs)
+        timeline = Timeline.compile(program)
+        crt = draw_crt(timeline)
         for row in crt:
             print(f'    {row}')
 
@@ -3,9 +3,15 @@ import math
 import operator
 from collections import deque
 from dataclasses import dataclass
+from functools import lru_cache
 from itertools import groupby
 from typing import Optional
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def tail(line, sep):
     return line.split(sep)[-1].strip()
 
@@ -91,21 +97,191 @@ def round_part2(monkeys):
             rx.items.append(item)               # Receiver gets the item.
 
 
+SYMBOLS = {operator.add: '+', operator.mul: '*'}
+
+
+def rules(monkeys):
+    '''Hashable summary of everything that decides how a round is played'''
+    return tuple(
+        (SYMBOLS[m.operation.function], m.operation.arg,
+         m.divisor, m.if_true, m.if_false)
+        for m in monkeys)
+
+
+@lru_cache
+def compile_round(rules, relief):
+    '''Round function specialized to `rules`, with `relief` applied to worry
+
+    Operators and constants are inlined and the loop over monkeys unrolled,
+    so the generated code does no attribute lookups or branching on rules.
+    '''
+    names = [f'items{i}' for i in range(len(rules))]
+    source = [
+        'def play_round(monkeys):',
+        f'    {", ".join(names)}, = [m.items for m in monkeys]',
+    ]
+    for i, (symbol, arg, divisor, if_true, if_false) in enumerate(rules):
+        if i in (if_true, if_false):
+            raise ValueError(f'Monkey {i} throws items to itself')
+        operand = 'old' if arg is None else arg
+        source += [
+            f'    monkeys[{i}].activity += len({names[i]})',
+            f'    for old in {names[i]}:',
+            f'        new = (old {symbol} {operand}){relief}',
+            f'        if new % {divisor} == 0: {names[if_true]}.append(new)',
+            f'        else: {names[if_false]}.append(new)',
+            f'    {names[i]}.clear()',
+        ]
+    namespace = {}
+    exec('\n'.join(source), namespace)
+    return namespace['play_round']
+
+
+def compile_round_part1(monkeys):
+    return compile_round(rules(monkeys), ' // 3')
+
+
+def compile_round_part2(monkeys):
+    worry_cap = math.lcm(*[m.divisor for m in monkeys])
+    return compile_round(rules(monkeys), f' % {worry_cap}')
+
+
+def play(monkeys, /, rounds, play_round):
+    for i in range(rounds):
+        play_round(monkeys)
+    monkeys = sorted(monkeys, key=lambda m: m.activity)
+    return monkeys[-1].activity * monkeys[-2].activity
+
+
 def solve(filepath, /, rounds, play_round):
+    with open(filepath) as f:
+        return play(list(parse_monkeys(f)), rounds=rounds, play_round=play_round)
+
+
+def item_round(monkeys, state, worry_cap):
+    '''Play one part 2 round for a single item in `state` (monkey, worry)
+
+    Returns the item's state for the next round and the monkeys that
+    inspected it during this one.
+    '''
+    index, item = state
+    inspected = []
+    while True:
+        monkey = monkeys[index]
+        inspected.append(index)
+        item = monkey.operation.apply(item) % worry_cap
+        rx = monkey.decide(item)
+        if rx <= index:     # Thrown back: waits for the receiver's next turn.
+            return (rx, item), inspected
+        index = rx          # Thrown forward: inspected again this round.
+
+
+def item_activity(monkeys, state, rounds, worry_cap):
+    '''How many times each monkey inspects the item in `state` over `rounds`
+
+    There are finitely many states under `worry_cap`, so the item's sequence
+    of states is eventually periodic: once a state repeats, the remaining
+    rounds are whole cycles plus a partial one.
+    '''
+    seen, history = {}, []
+    while state not in seen and len(history) < rounds:
+        seen[state] = len(history)
+        state, inspected = item_round(monkeys, state, worry_cap)
+        history.append(inspected)
+
+    if len(history) == rounds:
+        cycle_start, full_cycles, partial = rounds, 0, 0
+    else:
+        cycle_start = seen[state]
+        full_cycles, partial = divmod(rounds - cycle_start,
+                                      len(history) - cycle_start)
+
+    activity = [0] * len(monkeys)
+    for r, inspected in enumerate(history):
+        if r < cycle_start:
+            times = 1
+        else:
+            times = full_cycles + (r - cycle_start < partial)
+        for index in inspected:
+            activity[index] += times
+    return activity
+
+
+def solve_cycles(filepath, /, rounds):
+    '''Same as part 2 for any number of rounds, without playing them all'''
+    with open(filepath) as f:
+        monkeys = list(parse_monkeys(f))
+        worry_cap = math.lcm(*[m.divisor for m in monkeys])
+        activity = [0] * len(monkeys)
+        for index, monkey in enumerate(monkeys):
+            for item in monkey.items:
+                counts = item_activity(monkeys, (index, item), rounds, worry_cap)
+                activity = [a + c for a, c in zip(activity, counts)]
+        activity.sort()
+        return activity[-1] * activity[-2]
+
+
+def rounds_batch(monkeys, rounds):
+    '''Activity of each monkey after `rounds` part 2 rounds
+
+    Worry levels are kept in arrays grouped by the monkey holding them, so
+    each turn handles all of that monkey's items at once and only touches
+    those items.
+    '''
+    worry_cap = math.lcm(*[m.divisor for m in monkeys])
+    # Worry is kept below `worry_cap` (reducing the starting items too is fine
+    # since operations only add and multiply), so it must fit in int64 after
+    # the largest operation; otherwise fall back to Python ints.
+    args = [m.operation.arg for m in monkeys if m.operation.arg is not None]
+    largest = (worry_cap - 1) * max([worry_cap - 1, *args])
+    dtype = np.int64 if largest < 2 ** 63 else object
+
+    # Arrays of worry thrown to each monkey, joined when its turn comes.
+    held = [[np.array([item % worry_cap for item in m.items], dtype=dtype)]
+            for m in monkeys]
+    activity = [0] * len(monkeys)
+    for _ in range(rounds):
+        for index, monkey in enumerate(monkeys):
+            thrown, held[index] = held[index], []
+            if not thrown:
+                continue
+            old = thrown[0] if len(thrown) == 1 else np.concatenate(thrown)
+            activity[index] += len(old)
+            op = monkey.operation
+            new = op.function(old, old if op.arg is None else op.arg) % worry_cap
+            divisible = new % monkey.divisor == 0
+            held[monkey.if_true].append(new[divisible])
+            held[monkey.if_false].append(new[~divisible])
+    return activity
+
+
+# Below this many items NumPy's per-call overhead outweighs batching them.
+BATCH_MIN_ITEMS = 64
+
+
+def solve_batch(filepath, /, rounds):
+    '''Same as part 2, batched with NumPy when available and worth it'''
     with open(filepath) as f:
         monkeys = list(parse_monkeys(f))
-        for i in range(rounds):
-            play_round(monkeys)
-        monkeys = sorted(monkeys, key=lambda m: m.activity)
-        return monkeys[-1].activity * monkeys[-2].activity
+    if np is None or sum(len(m.items) for m in monkeys) < BATCH_MIN_ITEMS:
+        for _ in range(rounds):
+            round_part2(monkeys)
+        activity = sorted(m.activity for m in monkeys)
+    else:
+        activity = sorted(rounds_batch(monkeys, rounds))
+    return activity[-1] * activity[-2]
 
 
 def part1(filepath):
-    return solve(filepath, rounds=20, play_round=round_part1)
+    with open(filepath) as f:
+        monkeys = list(parse_monkeys(f))
+    return play(monkeys, rounds=20, play_round=compile_round_part1(monkeys))
 
 
 def part2(filepath):
-    return solve(filepath, rounds=10_000, play_round=round_part2)
+    with open(filepath) as f:
+        monkeys = list(parse_monkeys(f))
+    return play(monkeys, rounds=10_000, play_round=compile_round_part2(monkeys))
 
 
 if __name__ == '__main__':
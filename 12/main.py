@@ -1,20 +1,17 @@
 #!/usr/bin/env python3
+import heapq
+from array import array
+from collections import deque, namedtuple
 from dataclasses import dataclass
 from functools import cached_property
 
-def height(value):
-    if value == 'S': value = 'a'
-    if value == 'E': value = 'z'
-    return ord(value) - ord('a')
-
-
 @dataclass(frozen=True)
 class Point:
     x: int
     y: int
 
-    def __add__(self, other):
-        return Point(self.x + other.x, self.y + other.y)
+
+Search = namedtuple('Search', 'length,expanded')
 
 
 @dataclass
@@ -34,9 +31,6 @@ class HeightMap:
                 if cell == 'E': end   = Point(x, y)
         return cls(rows, start, end)
 
-    def __getitem__(self, point):
-        return self.contents[point.y][point.x]
-
     def __iter__(self):
         for y, row in enumerate(self.contents):
             for x, item in enumerate(row):
@@ -50,58 +44,184 @@ class HeightMap:
     def height(self):
         return len(self.contents)
 
-    def neighbors(self, point):
-        result = set()
-        for delta in (Point(0, -1), Point(-1, 0), Point(0, +1), Point(+1, 0)):
-            neighbor = point + delta
-            if all((neighbor.x >= 0, neighbor.x < self.width,
-                    neighbor.y >= 0, neighbor.y < self.height)):
-                result.add(neighbor)
-        return result
+    def index(self, point):
+        return point.y * self.width + point.x
+
+    @cached_property
+    def elevations(self):
+        '''Elevation of every cell (as a letter code), indexed by `index`'''
+        cells = ''.join(self.contents).translate(str.maketrans('SE', 'az'))
+        return bytearray(cells.encode())
+
+    def adjacency(self, allowed):
+        '''Moves between neighbors for which `allowed(from, to)` elevations hold,
+        in CSR form: the moves from cell `i` go to `targets[offsets[i]:offsets[i + 1]]`'''
+        elevations, width = self.elevations, self.width
+        offsets, targets = array('l', [0]), array('l')
+        for i, h in enumerate(elevations):
+            x = i % width
+            for j in (i - width, i - 1 if x > 0 else -1,
+                      i + width, i + 1 if x < width - 1 else -1):
+                if 0 <= j < len(elevations) and allowed(h, elevations[j]):
+                    targets.append(j)
+            offsets.append(len(targets))
+        return offsets, targets
+
+    @cached_property
+    def climbs(self):
+        return self.adjacency(lambda here, there: there - here <= 1)
+
+    @cached_property
+    def descents(self):
+        '''Reverse of `climbs`: the cells that can climb to each cell'''
+        return self.adjacency(lambda here, there: here - there <= 1)
+
+    def search(self, start=None, end=None, method='bfs'):
+        '''Shortest path from `start` to `end` with the given search `method`
+
+        Returns the path length (None if unreachable) and how many cells were
+        expanded to find it.
+        '''
+        methods = {
+            'bfs': self.bfs,
+            'astar': self.astar,
+            'bidirectional': self.bidirectional,
+        }
+        if method not in methods:
+            raise ValueError(f'Invalid search method: {method}')
+        source = self.index(start if start is not None else self.start)
+        target = self.index(end if end is not None else self.end)
+        if source == target:
+            return Search(0, 0)
+        return methods[method](source, target)
+
+    def shortest_path(self, start=None):
+        return self.search(start).length
 
     # Expand the border from Start until we reach the End, while making sure we
     # don't double back and only climb when not too steep. The path length is
     # equal to the number of times we expanded the border.
-    def shortest_path(self, start=None):
-        border = { start if start is not None else self.start }
-        visited = set()
-        count = 0
+    def bfs(self, source, target):
+        offsets, targets = self.climbs
+        visited = bytearray(len(self.elevations))
+        visited[source] = 1
+        border = deque([source])
+        count, expanded = 0, 0
         while border:
             count += 1
-            next_border = set()
-            for item in border:
-                visited.add(item)
-                for neighbor in self.neighbors(item):
-                    # This neighbor was already visited via another (shorter)
-                    # path -> ignore it.
-                    if neighbor in visited:
-                        continue
-
-                    # Ignore the neighbor it the climb is too steep.
-                    if height(self[neighbor]) - height(self[item]) > 1:
+            for _ in range(len(border)):
+                item = border.popleft()
+                expanded += 1
+                for k in range(offsets[item], offsets[item + 1]):
+                    neighbor = targets[k]
+                    if visited[neighbor]:
                         continue
-
-                    # Reached the end -> DONE!
-                    if neighbor == self.end:
-                        return count
-
-                    next_border.add(neighbor)
-            border = next_border
+                    if neighbor == target:
+                        return Search(count, expanded)
+                    visited[neighbor] = 1
+                    border.append(neighbor)
 
         # Could not reach the end.
-        return None
+        return Search(None, expanded)
+
+    # Every step moves one cell and climbs at most one level, so neither the
+    # Manhattan distance nor the height still to climb overestimate the rest
+    # of the path.
+    def astar(self, source, target):
+        offsets, targets = self.climbs
+        elevations, width = self.elevations, self.width
+        ty, tx = divmod(target, width)
+
+        def estimate(i):
+            y, x = divmod(i, width)
+            return max(abs(x - tx) + abs(y - ty), elevations[target] - elevations[i])
+
+        best = {source: 0}
+        queue = [(estimate(source), 0, source)]
+        expanded = 0
+        while queue:
+            _, cost, item = heapq.heappop(queue)
+            if cost > best[item]:
+                continue    # Already expanded through a shorter path.
+            if item == target:
+                return Search(cost, expanded)
+            expanded += 1
+            for k in range(offsets[item], offsets[item + 1]):
+                neighbor = targets[k]
+                if cost + 1 < best.get(neighbor, cost + 2):
+                    best[neighbor] = cost + 1
+                    heapq.heappush(queue, (cost + 1 + estimate(neighbor),
+                                           cost + 1, neighbor))
+
+        return Search(None, expanded)
+
+    # Expand the smaller border, a whole level at a time, climbing forward from
+    # the source or descending backward from the target, until they meet.
+    def bidirectional(self, source, target):
+        sides = [
+            (self.climbs, {source: 0}, [source]),
+            (self.descents, {target: 0}, [target]),
+        ]
+        expanded = 0
+        while sides[0][2] and sides[1][2]:
+            if len(sides[1][2]) < len(sides[0][2]):
+                sides.reverse()
+            (offsets, targets), distances, border = sides[0]
+            other = sides[1][1]
+            best, next_border = None, []
+            for item in border:
+                expanded += 1
+                for k in range(offsets[item], offsets[item + 1]):
+                    neighbor = targets[k]
+                    if neighbor in other:
+                        length = distances[item] + 1 + other[neighbor]
+                        best = length if best is None else min(best, length)
+                    if neighbor not in distances:
+                        distances[neighbor] = distances[item] + 1
+                        next_border.append(neighbor)
+            if best is not None:
+                return Search(best, expanded)
+            sides[0] = ((offsets, targets), distances, next_border)
+
+        return Search(None, expanded)
+
+    # Walk back from the End, only stepping down to cells from which the climb
+    # would not be too steep, to get the distance to the End from every cell
+    # (-1 where the End can't be reached).
+    @cached_property
+    def distances_to_end(self):
+        offsets, targets = self.descents
+        distances = array('l', [-1]) * len(self.elevations)
+        end = self.index(self.end)
+        distances[end] = 0
+        queue = deque([end])
+        while queue:
+            item = queue.popleft()
+            distance = distances[item] + 1
+            for k in range(offsets[item], offsets[item + 1]):
+                neighbor = targets[k]
+                if distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    queue.append(neighbor)
+        return distances
+
+    def distance_to_end(self, start=None):
+        '''Length of the shortest path to the End, or None if unreachable'''
+        index = self.index(start if start is not None else self.start)
+        distance = self.distances_to_end[index]
+        return distance if distance >= 0 else None
 
 
 def part1(filepath):
     with open(filepath) as f:
-        return HeightMap.parse(f).shortest_path()
+        return HeightMap.parse(f).distance_to_end()
 
 
 def part2(filepath):
     with open(filepath) as f:
         hm = HeightMap.parse(f)
         starting_positions = [p for p, value in hm if value in 'aS']
-        return min(filter(None, map(hm.shortest_path, starting_positions)))
+        return min(filter(None, map(hm.distance_to_end, starting_positions)))
 
 
 if __name__ == '__main__':